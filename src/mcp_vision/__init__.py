@@ -1,17 +1,4 @@
-import logging
-import sys
-
-from .server import mcp
-
-logger = logging.getLogger(__name__)
-
-
-def main():
-    try:
-        mcp.run(transport="stdio")
-    except Exception as e:
-        logger.error(f"Error starting server: {e}")
-        sys.exit(1)
+from .server import main
 
 
 __all__ = ["main"]
@@ -1,22 +1,91 @@
+import functools
 import hashlib
 import logging
 import os
 import sqlite3
+import threading
 import time
-from typing import Optional, Tuple
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from mcp_vision.utils import URL_PREFIXES
 
 logger = logging.getLogger(__name__)
 
+# Connection PRAGMAs, applied once when the shared connection is opened
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=1073741824",  # 1 GiB
+    "PRAGMA cache_size=-65536",  # 64 MiB
+    "PRAGMA busy_timeout=5000",
+)
+
+# Number of results kept in the in-process LRU in front of SQLite. The LRU is
+# disabled when the HTTP server runs several worker processes (WORKERS > 1): a
+# clear in one worker could not reach the others' LRUs, which would keep serving
+# the cleared results
+_MEM_CAP = 128 if int(os.environ.get("WORKERS", 1)) <= 1 else 0
+
+# Writes between WAL checkpoints and between ANALYZE runs
+_CHECKPOINT_EVERY = 1000
+_ANALYZE_EVERY = 10000
+
+# Hot-path statements, kept as constants so every call passes the identical
+# SQL text and hits the connection's prepared-statement cache
+SQL_GET = """
+    UPDATE ocr_cache
+    SET accessed_at = CURRENT_TIMESTAMP
+    WHERE file_hash = ? AND min_confidence = ?
+    RETURNING ocr_result
+"""
+
+SQL_PUT = """
+    INSERT OR REPLACE INTO ocr_cache
+    (file_hash, file_path, ocr_result, min_confidence, accessed_at)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+SQL_GET_PAGES = """
+    SELECT page_num, ocr_result FROM ocr_page_cache
+    WHERE file_hash = ? AND min_confidence = ? AND page_num < ?
+"""
+
+SQL_PUT_PAGE = """
+    INSERT OR REPLACE INTO ocr_page_cache
+    (file_hash, page_num, min_confidence, ocr_result, accessed_at)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+SQL_COUNT = "SELECT (SELECT COUNT(*) FROM ocr_cache) + (SELECT COUNT(*) FROM ocr_page_cache)"
+
+
+def _compress(ocr_result: str) -> bytes:
+    """Compress an OCR result for storage"""
+    return zlib.compress(ocr_result.encode())
+
+
+def _decompress(stored) -> str:
+    """Decode a stored OCR result; rows written before compression hold plain text"""
+    if isinstance(stored, bytes):
+        return zlib.decompress(stored).decode()
+    return stored
+
 
 class OCRCache:
     """SQLite-based cache for OCR results"""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, content_hash: bool = True):
         """
         Initialize the OCR cache database
         
         Args:
             db_path: Path to the SQLite database file (default: data/ocr_cache.db)
+            content_hash: Identify local files by a SHA256 of their content (default: True).
+                          When False, files are identified by (device, inode, mtime, size)
+                          so cache lookups never read the file
         """
         if db_path is None:
             # Default to data/ocr_cache.db, creating directory if needed
@@ -25,15 +94,32 @@ class OCRCache:
             db_path = os.path.join(data_dir, "ocr_cache.db")
         
         self.db_path = db_path
+        self.content_hash = content_hash
+        
+        # One long-lived connection in autocommit mode, shared across threads
+        # and serialized by a lock; keeps SQLite's page cache warm between calls
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        for pragma in _PRAGMAS:
+            self._conn.execute(pragma)
+        
+        # In-process LRU of recent results keyed by (file_hash, min_confidence),
+        # guarded by the same lock, so hot entries skip SQLite entirely
+        self._mem: "OrderedDict[Tuple[str, float], str]" = OrderedDict()
+        
+        # Writes since the connection was opened, used to schedule maintenance
+        self._write_count = 0
+        
         self._init_db()
     
     def _init_db(self):
         """Initialize the database and create tables if they don't exist"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 
-                # Create cache table
+                # Create cache table; ocr_result holds zlib-compressed UTF-8 as a BLOB
+                # (TEXT affinity leaves BLOBs untouched), older rows may hold plain text
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS ocr_cache (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -52,92 +138,165 @@ class OCRCache:
                     ON ocr_cache(file_hash)
                 """)
                 
-                conn.commit()
+                # Create per-page table for PDF results, so pages already OCRed are
+                # reused when a document is read again with a different page count
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS ocr_page_cache (
+                        file_hash TEXT NOT NULL,
+                        page_num INTEGER NOT NULL,
+                        min_confidence REAL NOT NULL,
+                        ocr_result TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        accessed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (file_hash, page_num, min_confidence)
+                    )
+                """)
+                
                 logger.info(f"OCR cache database initialized at {self.db_path}")
                 
         except Exception as e:
             logger.error(f"Failed to initialize cache database: {e}")
             raise
     
-    def _calculate_file_hash(self, file_path: str) -> Optional[str]:
+    def hash_file(self, file_path: str, content_hash: Optional[bool] = None) -> Optional[str]:
         """
-        Calculate SHA256 hash of a file or cache key
+        Calculate the SHA256 identifier of a local file
         
         Args:
-            file_path: Path to the file (local path or URL), or a cache key
+            file_path: Path to the local file
+            content_hash: Hash the file content rather than its stat signature
+                          (default: the cache's content_hash setting)
             
         Returns:
             SHA256 hash as hex string, or None if file cannot be accessed
         """
+        if content_hash is None:
+            content_hash = self.content_hash
+        
         try:
-            if file_path.startswith("http://") or file_path.startswith("https://"):
-                # For URLs, hash the URL itself as the identifier
-                # In a production environment, you might want to download and hash the content
-                return hashlib.sha256(file_path.encode()).hexdigest()
-            elif "_pages_" in file_path and "_conf_" in file_path:
-                # This is a PDF cache key, hash it directly
-                return hashlib.sha256(file_path.encode()).hexdigest()
-            else:
-                # For local files, hash the file content
-                if not os.path.isfile(file_path):
-                    logger.warning(f"File not found: {file_path}")
-                    return None
-                
-                hash_sha256 = hashlib.sha256()
-                with open(file_path, "rb") as f:
-                    # Read file in chunks to handle large files efficiently
-                    for chunk in iter(lambda: f.read(4096), b""):
-                        hash_sha256.update(chunk)
-                return hash_sha256.hexdigest()
-                
+            if not os.path.isfile(file_path):
+                logger.warning(f"File not found: {file_path}")
+                return None
+            
+            if not content_hash:
+                # Identify the file by its stat signature without reading it
+                st = os.stat(file_path)
+                key = f"{st.st_dev}:{st.st_ino}:{st.st_mtime_ns}:{st.st_size}"
+                return hashlib.sha256(key.encode()).hexdigest()
+            
+            with open(file_path, "rb") as f:
+                # file_digest reads and hashes in C without holding the GIL
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            
         except Exception as e:
             logger.error(f"Error calculating hash for {file_path}: {e}")
             return None
     
-    def get(self, file_path: str, min_confidence: float = 0.0) -> Optional[str]:
+    def _calculate_file_hash(self, file_path: str) -> Optional[str]:
         """
-        Retrieve OCR result from cache
+        Calculate SHA256 hash of a file
         
         Args:
             file_path: Path to the file (local path or URL)
-            min_confidence: Minimum confidence threshold used for OCR
             
         Returns:
-            Cached OCR result if found, None otherwise
+            SHA256 hash as hex string, or None if file cannot be accessed
         """
-        file_hash = self._calculate_file_hash(file_path)
-        if not file_hash:
-            return None
+        if file_path.startswith(URL_PREFIXES):
+            # For URLs, hash the URL itself as the identifier
+            # In a production environment, you might want to download and hash the content
+            return hashlib.sha256(file_path.encode()).hexdigest()
         
+        # For local files, hash the file content
+        return self.hash_file(file_path)
+    
+    def _remember(self, mem_key: Tuple[str, float], ocr_result: str):
+        """Add a result to the in-process LRU; the caller must hold the lock"""
+        if not _MEM_CAP:
+            return
+        self._mem[mem_key] = ocr_result
+        self._mem.move_to_end(mem_key)
+        if len(self._mem) > _MEM_CAP:
+            self._mem.popitem(last=False)
+    
+    def _record_write(self):
+        """Count a write and run periodic maintenance; the caller must hold the lock.
+
+        Truncating the WAL keeps it from growing without bound (which slows every
+        read that has to walk it), and ANALYZE keeps the query planner's stats fresh.
+        """
+        self._write_count += 1
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT ocr_result FROM ocr_cache 
-                    WHERE file_hash = ? AND min_confidence = ?
-                """, (file_hash, min_confidence))
+            if self._write_count % _CHECKPOINT_EVERY == 0:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if self._write_count % _ANALYZE_EVERY == 0:
+                self._conn.execute("ANALYZE")
+        except Exception as e:
+            logger.warning(f"Cache maintenance failed: {e}")
+    
+    def _get_row(self, file_hash: str, min_confidence: float, label: str) -> Optional[str]:
+        """Look up a cached result by its row identifier"""
+        mem_key = (file_hash, min_confidence)
+        try:
+            with self._lock:
+                if mem_key in self._mem:
+                    self._mem.move_to_end(mem_key)
+                    logger.info(f"Cache hit for {label}")
+                    return self._mem[mem_key]
                 
-                result = cursor.fetchone()
-                if result:
-                    # Update access time
-                    cursor.execute("""
-                        UPDATE ocr_cache 
-                        SET accessed_at = CURRENT_TIMESTAMP 
-                        WHERE file_hash = ? AND min_confidence = ?
-                    """, (file_hash, min_confidence))
-                    conn.commit()
-                    
-                    logger.info(f"Cache hit for {file_path}")
-                    return result[0]
+                # Read the result and touch the access time in one statement
+                cursor = self._conn.execute(SQL_GET, mem_key)
+                
+                # Drain the cursor so the statement completes and its implicit write commits
+                rows = cursor.fetchall()
+                if rows:
+                    result = _decompress(rows[0][0])
+                    self._remember(mem_key, result)
+                    logger.info(f"Cache hit for {label}")
+                    return result
                 else:
-                    logger.info(f"Cache miss for {file_path}")
+                    logger.info(f"Cache miss for {label}")
                     return None
                     
         except Exception as e:
             logger.error(f"Error retrieving from cache: {e}")
             return None
     
-    def put(self, file_path: str, ocr_result: str, min_confidence: float = 0.0):
+    def _put_row(self, file_hash: str, file_path: str, ocr_result: str, min_confidence: float):
+        """Store a result under its row identifier"""
+        try:
+            with self._lock:
+                # Use INSERT OR REPLACE to handle duplicates
+                self._conn.execute(SQL_PUT, (file_hash, file_path, _compress(ocr_result), min_confidence))
+                self._remember((file_hash, min_confidence), ocr_result)
+                self._record_write()
+                
+                logger.info(f"Cached OCR result for {file_path}")
+                
+        except Exception as e:
+            logger.error(f"Error storing in cache: {e}")
+    
+    def get(self, file_path: str, min_confidence: float = 0.0, variant: str = "") -> Optional[str]:
+        """
+        Retrieve OCR result from cache
+        
+        Args:
+            file_path: Path to the file (local path or URL)
+            min_confidence: Minimum confidence threshold used for OCR
+            variant: Extra OCR settings that change the result, e.g. the languages
+            
+        Returns:
+            Cached OCR result if found, None otherwise
+        """
+        file_hash = self._calculate_file_hash(file_path)
+        if not file_hash:
+            return None
+        if variant:
+            file_hash = f"{file_hash}:{variant}"
+        
+        return self._get_row(file_hash, min_confidence, file_path)
+    
+    def put(self, file_path: str, ocr_result: str, min_confidence: float = 0.0, variant: str = ""):
         """
         Store OCR result in cache
         
@@ -145,41 +304,110 @@ class OCRCache:
             file_path: Path to the file (local path or URL)
             ocr_result: OCR result to cache
             min_confidence: Minimum confidence threshold used for OCR
+            variant: Extra OCR settings that change the result, e.g. the languages
         """
         file_hash = self._calculate_file_hash(file_path)
         if not file_hash:
             logger.warning(f"Cannot cache result for {file_path}: unable to calculate hash")
             return
+        if variant:
+            file_hash = f"{file_hash}:{variant}"
         
+        self._put_row(file_hash, file_path, ocr_result, min_confidence)
+    
+    def get_raw(self, key: str, min_confidence: float = 0.0) -> Optional[str]:
+        """
+        Retrieve OCR result stored under a caller-built cache key
+        
+        Args:
+            key: Cache key, used as the row identifier without hashing
+            min_confidence: Minimum confidence threshold used for OCR
+            
+        Returns:
+            Cached OCR result if found, None otherwise
+        """
+        return self._get_row(key, min_confidence, key)
+    
+    def put_raw(self, key: str, ocr_result: str, min_confidence: float = 0.0):
+        """
+        Store OCR result under a caller-built cache key
+        
+        Args:
+            key: Cache key, used as the row identifier without hashing
+            ocr_result: OCR result to cache
+            min_confidence: Minimum confidence threshold used for OCR
+        """
+        self._put_row(key, key, ocr_result, min_confidence)
+    
+    def get_pages(self, key: str, num_pages: int, min_confidence: float = 0.0) -> Dict[int, str]:
+        """
+        Retrieve cached per-page OCR results for a document
+        
+        Args:
+            key: Identifier of the document and its rendering settings
+            num_pages: Only pages 0 to num_pages - 1 are returned
+            min_confidence: Minimum confidence threshold used for OCR
+            
+        Returns:
+            Mapping of page number (0-indexed) to OCR result for the cached pages
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Use INSERT OR REPLACE to handle duplicates
-                cursor.execute("""
-                    INSERT OR REPLACE INTO ocr_cache 
-                    (file_hash, file_path, ocr_result, min_confidence, accessed_at)
-                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """, (file_hash, file_path, ocr_result, min_confidence))
-                
-                conn.commit()
-                logger.info(f"Cached OCR result for {file_path}")
+            with self._lock:
+                rows = self._conn.execute(SQL_GET_PAGES, (key, min_confidence, num_pages)).fetchall()
+            logger.info(f"Cache hit for {len(rows)} of {num_pages} pages of {key}")
+            return {page_num: _decompress(stored) for page_num, stored in rows}
+            
+        except Exception as e:
+            logger.error(f"Error retrieving pages from cache: {e}")
+            return {}
+    
+    def put_pages(self, key: str, pages: Dict[int, str], min_confidence: float = 0.0):
+        """
+        Store per-page OCR results for a document
+        
+        Args:
+            key: Identifier of the document and its rendering settings
+            pages: Mapping of page number (0-indexed) to OCR result
+            min_confidence: Minimum confidence threshold used for OCR
+        """
+        try:
+            with self._lock:
+                # One explicit transaction, so the pages commit together instead of
+                # the autocommit connection committing after every row
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.executemany(SQL_PUT_PAGE, (
+                        (key, page_num, min_confidence, _compress(ocr_result))
+                        for page_num, ocr_result in pages.items()
+                    ))
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._record_write()
+                logger.info(f"Cached OCR result for {len(pages)} pages of {key}")
                 
         except Exception as e:
-            logger.error(f"Error storing in cache: {e}")
+            logger.error(f"Error storing pages in cache: {e}")
     
     def clear(self):
         """Clear all cached entries"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 cursor.execute("DELETE FROM ocr_cache")
-                conn.commit()
+                cursor.execute("DELETE FROM ocr_page_cache")
+                self._mem.clear()
                 logger.info("Cache cleared successfully")
                 
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
     
+    def close(self):
+        """Close the shared database connection"""
+        with self._lock:
+            self._conn.close()
+    
     def get_stats(self) -> Tuple[int, float]:
         """
         Get cache statistics
@@ -188,11 +416,11 @@ class OCRCache:
             Tuple of (number of entries, database size in MB)
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 
                 # Count entries
-                cursor.execute("SELECT COUNT(*) FROM ocr_cache")
+                cursor.execute(SQL_COUNT)
                 count = cursor.fetchone()[0]
                 
                 # Get database size
@@ -205,13 +433,9 @@ class OCRCache:
             return 0, 0.0
 
 
-# Global cache instance
-_cache = None
-
-
 def get_cache(db_path: str = None) -> OCRCache:
     """
-    Get the global cache instance, initializing if necessary
+    Get the shared cache instance for a database, initializing if necessary
     
     Args:
         db_path: Path to the SQLite database file (default: data/ocr_cache.db)
@@ -219,7 +443,16 @@ def get_cache(db_path: str = None) -> OCRCache:
     Returns:
         OCRCache instance
     """
-    global _cache
-    if _cache is None:
-        _cache = OCRCache(db_path)
-    return _cache
\ No newline at end of file
+    if db_path is None:
+        os.makedirs("data", exist_ok=True)
+        db_path = os.path.join("data", "ocr_cache.db")
+    # One instance per database file however its path is spelled, so every caller
+    # shares one lock and one in-memory LRU (a clear() through one reaches them all)
+    return _get_cache(os.path.abspath(db_path))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_cache(db_path: str) -> OCRCache:
+    """Create the cache instance for a normalized database path"""
+    content_hash = os.environ.get("OCR_CACHE_CONTENT_HASH", "1") != "0"
+    return OCRCache(db_path, content_hash=content_hash)
@@ -1,86 +1,370 @@
 import time
+import hashlib
 import logging
+import multiprocessing
 import os
-import io
-import requests
-from typing import List, Tuple, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence
 
-import easyocr
 import fitz  # PyMuPDF
 import numpy as np
-from PIL import Image as PILImage
 
-from mcp_vision.utils import load_image
+from mcp_vision.utils import HTTP_TIMEOUT, URL_PREFIXES, fetch_url_bytes, get_http_session, load_image
 from mcp_vision.cache import get_cache
 
+if TYPE_CHECKING:
+    import easyocr
+
 # Get batch size from environment variable, default to 1 for sequential processing
-# Batch size determines how many PDF pages to process simultaneously
+# Batch size determines how many PDF pages are OCRed together in one batched call
 DEFAULT_BATCH_SIZE = int(os.environ.get('BATCH_SIZE', '1'))
 
+# Number of detected text regions EasyOCR's recognizer decodes per forward pass
+RECOGNIZER_BATCH_SIZE = int(os.environ.get('OCR_RECOGNIZER_BATCH_SIZE', '8'))
+
+# Most same-sized images from concurrent requests coalesced into one batched EasyOCR call
+MAX_COALESCE = int(os.environ.get('OCR_MAX_COALESCE', '4'))
+
+# Run EasyOCR's detector and recognizer with int8 dynamic quantization on CPU
+# (EasyOCR's own default); set MCP_VISION_QUANTIZE=0 for full fp32 precision
+QUANTIZE = os.environ.get('MCP_VISION_QUANTIZE', '1').lower() not in ('0', 'false', 'no')
+
+# Load the default EasyOCR reader while the server starts, so the first request does
+# not wait for it; OCR_PRELOAD=0 defers loading to the first OCR call
+OCR_PRELOAD = os.environ.get('OCR_PRELOAD', '1') != '0'
+
+# Run a dummy OCR pass after startup so the first request does not pay for lazy
+# torch initialization; off by default to keep cold starts short
+OCR_WARMUP = os.environ.get('OCR_WARMUP', '0') == '1'
+
+# Run EasyOCR under fp16 autocast when it is on a CUDA GPU, halving the memory
+# traffic of its convolutions and LSTMs; opt in with OCR_FP16=1
+OCR_FP16 = os.environ.get('OCR_FP16', '0') == '1'
+
+# Compile EasyOCR's text detector with torch.compile to fuse its convolution
+# stack; compilation happens on the first call, so pair it with OCR_WARMUP=1
+OCR_COMPILE = os.environ.get('OCR_COMPILE', '0') == '1'
+
+# Languages loaded when a caller does not ask for specific ones
+DEFAULT_LANGUAGES = ['en', 'th']
+# Canonical reader key for the defaults, built once instead of on every request
+_DEFAULT_LANGUAGES_KEY = frozenset(DEFAULT_LANGUAGES)
+
+# Number of EasyOCR readers (one per language set) kept in memory at once
+MAX_READERS = int(os.environ.get('OCR_MAX_READERS', '4'))
+
+# Resolution PDF pages are rasterized at (144 DPI is a 2x zoom of the 72 DPI page
+# space), and the longest side in pixels a rendered page may reach; the zoom is
+# lowered for pages that would exceed it. Both are part of the per-page cache key
+PDF_DPI = float(os.environ.get('OCR_DPI', '144'))
+PDF_MAX_SIDE = int(os.environ.get('OCR_MAX_SIDE', '3000'))
+
 logger = logging.getLogger(__name__)
 
-# Global OCR reader instance
-_reader = None
+# Loaded OCR readers keyed by language set, oldest first
+# (easyocr and torch are imported on first use: they take seconds and hundreds of MB
+# to import, which tool listing and the PDF rendering workers never need)
+_readers: "OrderedDict[frozenset, easyocr.Reader]" = OrderedDict()
+# Serializes reader construction so concurrent first requests load each model only once
+_reader_lock = threading.Lock()
+
+
+def _languages_key(languages: Optional[Sequence[str]]) -> frozenset:
+    """Normalize a language list into the key of its reader"""
+    if not languages:
+        return _DEFAULT_LANGUAGES_KEY
+    return frozenset(languages)
+
+
+def _languages_variant(languages: Optional[Sequence[str]]) -> str:
+    """Cache key suffix for non-default languages (empty for the defaults)"""
+    if not languages:
+        return ""
+    key = frozenset(languages)
+    if key == _DEFAULT_LANGUAGES_KEY:
+        return ""
+    return "langs=" + ",".join(sorted(key))
+
+
+# The EasyOCR model is not safe for concurrent use, so every inference call runs
+# on this single dedicated thread; callers submit jobs and wait on their futures
+_ocr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="easyocr")
+
+
+# Single-image OCR requests waiting for the inference thread as (reader, image, future).
+# Requests arriving while the thread is busy pile up here and are drained together,
+# so concurrent same-sized images share one batched call without any added wait
+_pending_images = []
+_pending_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _fp16_autocast() -> bool:
+    """Whether fp16 autocast is requested and a CUDA device is there to run it"""
+    import torch
+    return OCR_FP16 and torch.cuda.is_available()
+
+
+def _inference_call(fn, *args, **kwargs):
+    """Run an EasyOCR call without autograd tracking, under fp16 autocast if enabled"""
+    import torch
+    with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16, enabled=_fp16_autocast()):
+        return fn(*args, **kwargs)
+
+# Long-lived pool of PDF page rendering processes, created on first use. Workers are
+# started through a fork server (spawn where that is unavailable) rather than forked:
+# by then this process runs the inference, event loop and torch threads, and a fork
+# could copy one of their locks while it is held
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+# Per-process PDF document used by a rendering worker, with the (path, mtime, size)
+# it was opened for; a call for another or a modified file reopens it
+_render_doc = None
+_render_doc_id = None
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """Return the shared page rendering pool, starting it on first use"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _render_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context(method))
+        return _render_pool
+
+
+def _discard_render_pool(pool: ProcessPoolExecutor):
+    """Drop a broken rendering pool so the next PDF starts a fresh one"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False)
+
+
+def _render_page_worker(pdf_file: str, page_num: int, keep_open: bool = True) -> np.ndarray:
+    """Rasterize one page of a PDF in a rendering worker. The document stays open
+    across the pages of a call unless keep_open is False (temporary downloads, which
+    the caller deletes afterwards)"""
+    global _render_doc, _render_doc_id
+    if not keep_open:
+        with fitz.open(pdf_file) as doc:
+            return OCRCore._render_pdf_page(doc[page_num])
+    st = os.stat(pdf_file)
+    doc_id = (pdf_file, st.st_mtime_ns, st.st_size)
+    if doc_id != _render_doc_id:
+        if _render_doc is not None:
+            _render_doc.close()
+        _render_doc = fitz.open(pdf_file)
+        _render_doc_id = doc_id
+    return OCRCore._render_pdf_page(_render_doc[page_num])
 
 
 class OCRCore:
     """Core OCR functionality shared between MCP server and HTTP server"""
     
     @staticmethod
-    def init_ocr_reader():
-        """Initialize the EasyOCR reader"""
-        global _reader
-        if _reader is None:
+    def init_ocr_reader(languages: Optional[Sequence[str]] = None):
+        """Initialize the EasyOCR reader for a language set (default: English and Thai)"""
+        key = _languages_key(languages)
+        reader = _readers.get(key)
+        if reader is not None:
+            return reader
+        with _reader_lock:
+            reader = _readers.get(key)
+            if reader is not None:
+                return reader
+            import easyocr
+            import torch
+            
             start = time.time()
-            _reader = easyocr.Reader(['en', 'th'])  # Support English and Thai
-            print(f"Loaded EasyOCR reader in {time.time() - start:.2f} seconds.")
+            reader = easyocr.Reader(sorted(key), quantize=QUANTIZE)
+            logger.info(f"Loaded EasyOCR reader for {sorted(key)} in {time.time() - start:.2f} seconds")
             
-            # Warm up the reader with a dummy operation to ensure models are fully loaded
-            try:
-                dummy_image = np.zeros((100, 100, 3), dtype=np.uint8)
-                _reader.readtext(dummy_image)
-                print("EasyOCR reader warmed up successfully.")
-            except Exception as e:
-                print(f"Warning: EasyOCR reader warmup failed: {e}")
+            if OCR_COMPILE:
+                # Page sizes vary, so compile for dynamic shapes rather than recompiling per size
+                torch.set_float32_matmul_precision("high")
+                reader.detector = torch.compile(reader.detector, dynamic=True)
+            
+            # Publish only once constructed, so the unlocked fast path never sees a partial reader
+            _readers[key] = reader
+            # Bound memory by dropping the oldest-loaded readers
+            while len(_readers) > max(MAX_READERS, 1):
+                _readers.popitem(last=False)
+            return reader
     
     @staticmethod
-    def get_reader():
-        """Get the OCR reader instance, initializing if necessary"""
-        if _reader is None:
-            OCRCore.init_ocr_reader()
-        return _reader
+    def get_reader(languages: Optional[Sequence[str]] = None):
+        """Get the OCR reader for a language set, initializing if necessary"""
+        return _readers.get(_languages_key(languages)) or OCRCore.init_ocr_reader(languages)
     
     @staticmethod
-    def extract_text_from_image_array(image_array: np.ndarray, min_confidence: float = 0.0) -> str:
-        """Extract text from a numpy array image using EasyOCR"""
-        reader = OCRCore.get_reader()
-        
-        # Extract text using EasyOCR with optimized parameters for Thai
-        results = reader.readtext(image_array, detail=1, paragraph=False)
+    def warmup_reader(languages: Optional[Sequence[str]] = None) -> bool:
+        """Run a dummy OCR pass so lazily initialized model state is ready before real requests"""
+        try:
+            reader = OCRCore.get_reader(languages)
+            dummy_image = np.zeros((100, 100, 3), dtype=np.uint8)
+            OCRCore._run_inference(reader.readtext, dummy_image)
+            logger.info("EasyOCR reader warmed up successfully")
+            return True
+        except Exception as e:
+            logger.warning(f"EasyOCR reader warmup failed: {e}")
+            return False
+    
+    @staticmethod
+    def _submit_inference(fn, *args, **kwargs):
+        """Queue an EasyOCR call on the inference thread and return its future"""
+        return _ocr_executor.submit(_inference_call, fn, *args, **kwargs)
+    
+    @staticmethod
+    def _submit_image(reader, image_array: np.ndarray) -> Future:
+        """Queue a single image for OCR, coalescing it with other requests waiting at the time"""
+        future = Future()
+        with _pending_lock:
+            _pending_images.append((reader, image_array, future))
+            # The first request in an empty queue schedules the drain; later ones ride along
+            schedule = len(_pending_images) == 1
+        if schedule:
+            OCRCore._submit_inference(OCRCore._drain_pending_images).add_done_callback(OCRCore._fail_pending_images)
+        return future
+    
+    @staticmethod
+    def _fail_pending_images(drain: Future):
+        """Fail the queued requests of a drain that could not run at all (e.g. torch failed
+        to import), so neither they nor later requests wait on a drain that never comes"""
+        error = drain.exception()
+        if error is None:
+            return
+        with _pending_lock:
+            pending = _pending_images[:]
+            _pending_images.clear()
+        for _, _, future in pending:
+            future.set_exception(error)
+    
+    @staticmethod
+    def _drain_pending_images():
+        """OCR every queued image on the inference thread, batching those that share a reader and size"""
+        with _pending_lock:
+            pending = _pending_images[:]
+            _pending_images.clear()
         
-        if not results or len(results) == 0:
+        try:
+            groups = {}
+            for request in pending:
+                reader, image_array, _ = request
+                groups.setdefault((id(reader), image_array.shape), []).append(request)
+            
+            for group in groups.values():
+                for start in range(0, len(group), max(MAX_COALESCE, 1)):
+                    chunk = group[start:start + max(MAX_COALESCE, 1)]
+                    reader = chunk[0][0]
+                    try:
+                        if len(chunk) == 1:
+                            results = [reader.readtext(chunk[0][1], batch_size=RECOGNIZER_BATCH_SIZE, detail=1, paragraph=False)]
+                        else:
+                            results = reader.readtext_batched(
+                                [image_array for _, image_array, _ in chunk],
+                                batch_size=RECOGNIZER_BATCH_SIZE,
+                                detail=1,
+                                paragraph=False,
+                            )
+                        if len(results) != len(chunk):
+                            raise RuntimeError(f"EasyOCR returned {len(results)} results for {len(chunk)} images")
+                    except Exception as e:
+                        for _, _, future in chunk:
+                            future.set_exception(e)
+                        continue
+                    for (_, _, future), result in zip(chunk, results):
+                        future.set_result(result)
+        finally:
+            # Whatever went wrong above, never leave a caller blocked on its future
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(RuntimeError("OCR request was dropped before it was processed"))
+    
+    @staticmethod
+    def _run_inference(fn, *args, **kwargs):
+        """Run an EasyOCR call on the inference thread and wait for its result"""
+        return OCRCore._submit_inference(fn, *args, **kwargs).result()
+    
+    @staticmethod
+    def _assemble_text(results: list, min_confidence: float = 0.0) -> str:
+        """Build the text output from EasyOCR (bbox, text, confidence) results"""
+        if not results:
             return ""
         
-        # Extract text with confidence filtering
-        extracted_texts = []
-        low_confidence_texts = []
+        # Confidence filtering; large result sets compare in one vectorized pass
+        if len(results) > 64:
+            confidences = np.fromiter((c for _, _, c in results), dtype=np.float64, count=len(results))
+            confident = (confidences >= min_confidence).tolist()
+        else:
+            confident = [c >= min_confidence for _, _, c in results]
         
-        for bbox, text, confidence in results:
-            if text.strip():
-                if confidence >= min_confidence:
-                    extracted_texts.append(text)
-                else:
-                    low_confidence_texts.append(f"{text} (confidence: {confidence:.2f})")
+        extracted_text = "\n".join(
+            text for (_, text, _), ok in zip(results, confident) if ok and text.strip()
+        )
+        if extracted_text:
+            return extracted_text
         
         # If no text meets the confidence threshold, include low confidence text for debugging
-        if not extracted_texts and low_confidence_texts:
-            return "Low confidence text detected:\n" + "\n".join(low_confidence_texts)
+        low_confidence_text = "\n".join(
+            f"{text} (confidence: {confidence:.2f})"
+            for (_, text, confidence), ok in zip(results, confident) if not ok and text.strip()
+        )
+        if low_confidence_text:
+            return "Low confidence text detected:\n" + low_confidence_text
         
-        return "\n".join(extracted_texts)
+        return ""
     
     @staticmethod
-    def read_text_from_image(image_path: str, min_confidence: float = 0.0, use_cache: bool = True) -> str:
+    def extract_text_from_image_array(image_array: np.ndarray, min_confidence: float = 0.0, languages: Optional[Sequence[str]] = None) -> str:
+        """Extract text from a numpy array image using EasyOCR"""
+        reader = OCRCore.get_reader(languages)
+        
+        # Extract text using EasyOCR, batched with any concurrent requests for same-sized images
+        results = OCRCore._submit_image(reader, image_array).result()
+        
+        return OCRCore._assemble_text(results, min_confidence)
+    
+    @staticmethod
+    def extract_text_from_image_arrays(image_arrays: List[np.ndarray], min_confidence: float = 0.0, batch_size: int = 1, languages: Optional[Sequence[str]] = None) -> List[str]:
+        """Extract text from several numpy array images with batched EasyOCR calls.
+
+        readtext_batched needs every image in a call to share one size, so images
+        are grouped by shape rather than resized; each group is one EasyOCR call.
+
+        Returns:
+            Extracted text for each image, in input order
+        """
+        reader = OCRCore.get_reader(languages)
+        
+        groups = {}
+        for index, image_array in enumerate(image_arrays):
+            groups.setdefault(image_array.shape, []).append(index)
+        
+        texts = [""] * len(image_arrays)
+        for indices in groups.values():
+            batch_results = OCRCore._run_inference(
+                reader.readtext_batched,
+                [image_arrays[i] for i in indices],
+                # Also the recognizer batch size, so never go below the regular one
+                batch_size=max(batch_size, RECOGNIZER_BATCH_SIZE),
+                detail=1,
+                paragraph=False,
+            )
+            for index, results in zip(indices, batch_results):
+                texts[index] = OCRCore._assemble_text(results, min_confidence)
+        
+        return texts
+    
+    @staticmethod
+    def read_text_from_image(image_path: str, min_confidence: float = 0.0, use_cache: bool = True, languages: Optional[List[str]] = None) -> str:
         """Extract text from an image using EasyOCR.
 
         Args:
@@ -88,27 +372,51 @@ class OCRCore:
             min_confidence (optional): minimum confidence threshold for text recognition (default: 0.0)
                                      Use 0.0 to include all recognized text, even low confidence
             use_cache (optional): whether to use caching (default: True)
+            languages (optional): EasyOCR language codes to recognize (default: ['en', 'th'])
         """
+        # Fail fast on a missing local file, before touching the cache or the reader
+        if not image_path.startswith(URL_PREFIXES) and not os.path.isfile(image_path):
+            return f"Error: Image file not found at {image_path}"
+        
+        variant = _languages_variant(languages)
+        
         # Try to get from cache first
         if use_cache:
             cache = get_cache()
-            cached_result = cache.get(image_path, min_confidence)
+            cached_result = cache.get(image_path, min_confidence, variant)
             if cached_result is not None:
                 return cached_result
         
         try:
-            # Load the image using the utility function
-            pil_image = load_image(image_path)
+            image_source = image_path
+            content_key = None
+            if image_path.startswith(URL_PREFIXES):
+                image_source = fetch_url_bytes(image_path)
+                if use_cache:
+                    # A URL miss may still be a known image: retries and signed URLs often
+                    # serve the same bytes under a new address, so also key by content
+                    content_key = f"image:{hashlib.sha256(image_source).hexdigest()}"
+                    if variant:
+                        content_key += f":{variant}"
+                    cached_result = cache.get_raw(content_key, min_confidence)
+                    if cached_result is not None:
+                        cache.put(image_path, cached_result, min_confidence, variant)
+                        return cached_result
             
-            # Convert PIL Image to numpy array for EasyOCR
-            image_array = np.array(pil_image)
+            # Load the image using the utility function, closing it (and its file
+            # handle) as soon as the pixels have been copied out
+            with load_image(image_source) as pil_image:
+                # Convert PIL Image to numpy array for EasyOCR
+                image_array = np.asarray(pil_image)
             
-            result = OCRCore.extract_text_from_image_array(image_array, min_confidence)
+            result = OCRCore.extract_text_from_image_array(image_array, min_confidence, languages)
             
             # Cache the result
             if use_cache and not result.startswith("Error occurred while extracting text"):
                 cache = get_cache()
-                cache.put(image_path, result, min_confidence)
+                cache.put(image_path, result, min_confidence, variant)
+                if content_key:
+                    cache.put_raw(content_key, result, min_confidence)
             
             return result
             
@@ -118,45 +426,61 @@ class OCRCore:
             return error_msg
     
     @staticmethod
-    def _process_pdf_page(page_num: int, page, min_confidence: float) -> Tuple[int, str]:
-        """Process a single PDF page and return its text.
+    def _render_pdf_page(page) -> np.ndarray:
+        """Rasterize a PyMuPDF page into a grayscale numpy array for EasyOCR"""
+        # Upsample for better OCR, but cap the pixel count of oversized pages since
+        # OCR cost grows with it; grayscale is all EasyOCR needs and is a third of the size of RGB
+        zoom = min(PDF_DPI / 72.0, PDF_MAX_SIDE / max(page.rect.width, page.rect.height, 1.0))
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+        # Wrap the raw samples directly instead of round-tripping through PNG;
+        # EasyOCR accepts 2-D grayscale arrays as they are
+        return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+    
+    @staticmethod
+    def _format_page_text(page_num: int, page_text: str) -> str:
+        """Format the OCR text of a single PDF page (page_num is 0-indexed)"""
+        if page_text:
+            if page_text.startswith("Low confidence text detected:"):
+                return f"\n--- Page {page_num + 1} (Low confidence text) ---\n{page_text}"
+            return f"\n--- Page {page_num + 1} ---\n{page_text}"
+        return f"\n--- Page {page_num + 1} (No text detected) ---\n"
+    
+    @staticmethod
+    def _process_pdf_pages(render_jobs: List[Callable[[], np.ndarray]], min_confidence: float, batch_size: int, languages: Optional[Sequence[str]] = None) -> List[str]:
+        """OCR a group of PDF pages together.
         
         Args:
-            page_num: Page number (0-indexed)
-            page: PyMuPDF page object
+            render_jobs: Zero-argument callables returning each page's image
             min_confidence: Minimum confidence threshold
+            batch_size: Batch size passed to EasyOCR
+            languages: EasyOCR language codes (default: English and Thai)
             
         Returns:
-            Tuple of (page_num, formatted_text)
+            Extracted text for each page, in page order
         """
-        try:
-            # Convert page to image
-            pix = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))  # 2x zoom for better OCR
-            img_data = pix.tobytes("png")
-            img = PILImage.open(io.BytesIO(img_data))
-            
-            # Convert PIL Image to numpy array for EasyOCR
-            img_array = np.array(img)
-            
-            # Extract text using the core method
-            page_text = OCRCore.extract_text_from_image_array(img_array, min_confidence)
-            
-            if page_text:
-                if page_text.startswith("Low confidence text detected:"):
-                    formatted_text = f"\n--- Page {page_num + 1} (Low confidence text) ---\n{page_text}"
-                else:
-                    formatted_text = f"\n--- Page {page_num + 1} ---\n{page_text}"
-            else:
-                formatted_text = f"\n--- Page {page_num + 1} (No text detected) ---\n"
-                
-            return (page_num, formatted_text)
-            
-        except Exception as e:
-            logger.error(f"Error processing page {page_num + 1}: {e}")
-            return (page_num, f"\n--- Error processing page {page_num + 1}: {str(e)} ---\n")
+        images = [render() for render in render_jobs]
+        return OCRCore.extract_text_from_image_arrays(images, min_confidence, batch_size, languages)
+    
+    @staticmethod
+    def _download_pdf(pdf_url: str) -> str:
+        """Stream a PDF from a URL into a temporary file and return its path.
+
+        The caller is responsible for removing the file.
+        """
+        with get_http_session().get(pdf_url, stream=True, timeout=HTTP_TIMEOUT) as response:
+            response.raise_for_status()
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                try:
+                    for chunk in response.iter_content(chunk_size=1 << 20):
+                        tmp.write(chunk)
+                except Exception:
+                    tmp.close()
+                    os.remove(tmp.name)
+                    raise
+        return tmp.name
     
     @staticmethod
-    def read_text_from_pdf(pdf_path: str, num_pages: int = None, min_confidence: float = 0.0, use_cache: bool = True, batch_size: int = None) -> str:
+    def read_text_from_pdf(pdf_path: str, num_pages: int = None, min_confidence: float = 0.0, use_cache: bool = True, batch_size: int = None, languages: Optional[List[str]] = None) -> str:
         """Extract text from a PDF file by converting each page to an image and using EasyOCR.
 
         Args:
@@ -165,8 +489,10 @@ class OCRCore:
             min_confidence (optional): minimum confidence threshold for text recognition (default: 0.0)
                                      Use 0.0 to include all recognized text, even low confidence
             use_cache (optional): whether to use caching (default: True)
-            batch_size (optional): number of pages to process simultaneously (default: from BATCH_SIZE env var or 1)
-                                 Set to 1 for sequential processing, higher values for parallel processing
+            batch_size (optional): number of pages to OCR per batched EasyOCR call (default: from BATCH_SIZE env var or 1)
+                                 Set to 1 to process one page at a time, higher values to batch pages together
+                                 Values above 1 also render pages in a pool of worker processes
+            languages (optional): EasyOCR language codes to recognize (default: ['en', 'th'])
         
         Returns:
             Concatenated text from all processed pages
@@ -175,70 +501,149 @@ class OCRCore:
         if batch_size is None:
             batch_size = DEFAULT_BATCH_SIZE
         
-        # Try to get from cache first
-        if use_cache:
+        # Settings the OCR text depends on besides the document, and the pages requested
+        settings = f"dpi={PDF_DPI:g}:max={PDF_MAX_SIDE}"
+        variant = _languages_variant(languages)
+        if variant:
+            settings += f":{variant}"
+        pages = f"pages={'all' if num_pages is None else num_pages}"
+        is_url = pdf_path.startswith(URL_PREFIXES)
+        
+        # As for images, a URL seen before is answered without downloading it again
+        if use_cache and is_url:
             cache = get_cache()
-            # Create a unique cache key that includes pdf_path, num_pages, and min_confidence
-            cache_key = f"{pdf_path}_pages_{num_pages or 'all'}_conf_{min_confidence}"
-            cached_result = cache.get(cache_key, min_confidence)
+            cached_result = cache.get(pdf_path, min_confidence, f"{settings}:{pages}")
             if cached_result is not None:
                 return cached_result
         
+        downloaded_file = None
         try:
             # Handle URL case
-            if pdf_path.startswith("http://") or pdf_path.startswith("https://"):
-                response = requests.get(pdf_path)
-                response.raise_for_status()
-                pdf_bytes = response.content
-                doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+            if is_url:
+                # Stream to disk so the whole PDF is never held in memory
+                downloaded_file = OCRCore._download_pdf(pdf_path)
+                pdf_file = downloaded_file
             else:
                 # Local file case
                 if not os.path.isfile(pdf_path):
                     return f"Error: PDF file not found at {pdf_path}"
-                doc = fitz.open(pdf_path)
+                pdf_file = pdf_path
+            
+            # Otherwise results are keyed by the document's identity rather than its path,
+            # so a PDF edited in place (or new bytes behind a URL) is OCRed again
+            page_key = None
+            doc_key = None
+            if use_cache:
+                cache = get_cache()
+                # Downloads land in a fresh temporary file, so only their content identifies them
+                doc_hash = cache.hash_file(pdf_file, content_hash=True if downloaded_file else None)
+                if doc_hash:
+                    page_key = f"{doc_hash}:{settings}"
+                    # The whole result for this page count, checked before the per-page rows
+                    doc_key = f"{page_key}:{pages}"
+                    cached_result = cache.get_raw(doc_key, min_confidence)
+                    if cached_result is not None:
+                        if is_url:
+                            cache.put(pdf_path, cached_result, min_confidence, f"{settings}:{pages}")
+                        return cached_result
+            
+            doc = fitz.open(pdf_file)
             
             # Get total pages and determine how many to process
             total_pages = doc.page_count
             if num_pages is None or num_pages > total_pages:
                 num_pages = total_pages
             
-            logger.info(f"Processing {num_pages} pages with batch_size={batch_size}")
+            # Reuse any pages already OCRed for this document, e.g. by a call with fewer pages
+            page_texts = {}
+            if page_key:
+                page_texts = cache.get_pages(page_key, num_pages, min_confidence)
+            missing_pages = [page_num for page_num in range(num_pages) if page_num not in page_texts]
             
-            # Process pages either sequentially or in parallel based on batch_size
-            if batch_size <= 1:
-                # Sequential processing
-                all_text = []
-                for page_num in range(num_pages):
-                    page = doc[page_num]
-                    _, formatted_text = OCRCore._process_pdf_page(page_num, page, min_confidence)
-                    all_text.append(formatted_text)
+            logger.info(f"Processing {len(missing_pages)} of {num_pages} pages with batch_size={batch_size}")
+            
+            # OCR the pages in groups of batch_size, one batched EasyOCR call per group
+            batch_size = max(batch_size, 1)
+            page_groups = [missing_pages[start:start + batch_size] for start in range(0, len(missing_pages), batch_size)]
+            new_page_texts = {}
+            page_errors = {}
+            page_error_causes = []
+            
+            def record_error(page_nums, e):
+                page_error_causes.append(e)
+                logger.error(f"Error processing pages {page_nums[0] + 1}-{page_nums[-1] + 1}: {e}")
+                for page_num in page_nums:
+                    page_errors[page_num] = f"\n--- Error processing page {page_num + 1}: {str(e)} ---\n"
+            
+            def ocr_page_group(page_nums, render_jobs):
+                try:
+                    texts = OCRCore._process_pdf_pages(render_jobs, min_confidence, batch_size, languages)
+                    new_page_texts.update(zip(page_nums, texts))
+                except Exception as e:
+                    record_error(page_nums, e)
+            
+            if len(missing_pages) <= 1:
+                # Nothing to overlap, render and OCR in this thread
+                for page_nums in page_groups:
+                    ocr_page_group(page_nums, [partial(OCRCore._render_pdf_page, doc[page_num]) for page_num in page_nums])
+            elif batch_size == 1:
+                # One page at a time, but pipelined: the inference thread OCRs a page while
+                # this thread renders the next one (torch releases the GIL while it runs)
+                reader = OCRCore.get_reader(languages)
+                in_flight = None
+                for page_num in missing_pages + [None]:
+                    image = None
+                    if page_num is not None:
+                        try:
+                            image = OCRCore._render_pdf_page(doc[page_num])
+                        except Exception as e:
+                            record_error([page_num], e)
+                    if in_flight is not None:
+                        ocr_page_num, future = in_flight
+                        try:
+                            new_page_texts[ocr_page_num] = OCRCore._assemble_text(future.result(), min_confidence)
+                        except Exception as e:
+                            record_error([ocr_page_num], e)
+                    in_flight = None
+                    if image is not None:
+                        in_flight = (page_num, OCRCore._submit_image(reader, image))
             else:
-                # Parallel processing with ThreadPoolExecutor
-                page_results = {}
-                with ThreadPoolExecutor(max_workers=batch_size) as executor:
-                    # Submit all page processing tasks
-                    future_to_page = {
-                        executor.submit(OCRCore._process_pdf_page, page_num, doc[page_num], min_confidence): page_num
-                        for page_num in range(num_pages)
-                    }
-                    
-                    # Collect results as they complete
-                    for future in as_completed(future_to_page):
-                        page_num, formatted_text = future.result()
-                        page_results[page_num] = formatted_text
-                
-                # Sort results by page number to maintain order
-                all_text = [page_results[i] for i in range(num_pages)]
+                # Render pages in worker processes while this thread runs OCR on the shared
+                # reader; the next group is always rendering while the current one is OCRed
+                executor = _get_render_pool()
+                render = partial(_render_page_worker, pdf_file, keep_open=downloaded_file is None)
+                try:
+                    pending = [executor.submit(render, page_num) for page_num in page_groups[0]]
+                    for index, page_nums in enumerate(page_groups):
+                        rendering = pending
+                        if index + 1 < len(page_groups):
+                            pending = [executor.submit(render, page_num) for page_num in page_groups[index + 1]]
+                        ocr_page_group(page_nums, [future.result for future in rendering])
+                    # A worker that died mid-render fails its pages; don't hand the dead pool on
+                    if any(isinstance(error, BrokenProcessPool) for error in page_error_causes):
+                        _discard_render_pool(executor)
+                except BrokenProcessPool:
+                    _discard_render_pool(executor)
+                    raise
             
             doc.close()
+            
+            if page_key and new_page_texts:
+                cache.put_pages(page_key, new_page_texts, min_confidence)
+            page_texts.update(new_page_texts)
+            
+            all_text = [
+                page_errors[page_num] if page_num in page_errors else OCRCore._format_page_text(page_num, page_texts[page_num])
+                for page_num in range(num_pages)
+            ]
             result = "\n".join(all_text)
             
-            # Cache the result
-            if use_cache and not result.startswith("Error occurred while extracting text"):
-                cache = get_cache()
-                # Create a unique cache key that includes pdf_path, num_pages, and min_confidence
-                cache_key = f"{pdf_path}_pages_{num_pages or 'all'}_conf_{min_confidence}"
-                cache.put(cache_key, result, min_confidence)
+            # Cache the result, unless some pages failed
+            if use_cache and not page_errors:
+                if doc_key:
+                    cache.put_raw(doc_key, result, min_confidence)
+                if is_url:
+                    cache.put(pdf_path, result, min_confidence, f"{settings}:{pages}")
             
             return result
             
@@ -246,19 +651,28 @@ class OCRCore:
             logger.error(f"Error while extracting text from PDF: {e}")
             error_msg = f"Error occurred while extracting text from PDF: {str(e)}"
             return error_msg
+        
+        finally:
+            if downloaded_file is not None:
+                os.remove(downloaded_file)
 
 
 # Convenience functions for backward compatibility
-def init_ocr_reader():
+def init_ocr_reader(languages: Optional[List[str]] = None):
     """Initialize the EasyOCR reader (backward compatibility)"""
-    OCRCore.init_ocr_reader()
+    OCRCore.init_ocr_reader(languages)
+
+
+def warmup_ocr_reader(languages: Optional[List[str]] = None) -> bool:
+    """Run a dummy OCR pass on the EasyOCR reader"""
+    return OCRCore.warmup_reader(languages)
 
 
-def read_text_from_image(image_path: str, min_confidence: float = 0.0, use_cache: bool = True) -> str:
+def read_text_from_image(image_path: str, min_confidence: float = 0.0, use_cache: bool = True, languages: Optional[List[str]] = None) -> str:
     """Extract text from an image using EasyOCR (backward compatibility)"""
-    return OCRCore.read_text_from_image(image_path, min_confidence, use_cache)
+    return OCRCore.read_text_from_image(image_path, min_confidence, use_cache, languages)
 
 
-def read_text_from_pdf(pdf_path: str, num_pages: int = None, min_confidence: float = 0.0, use_cache: bool = True, batch_size: int = None) -> str:
+def read_text_from_pdf(pdf_path: str, num_pages: int = None, min_confidence: float = 0.0, use_cache: bool = True, batch_size: int = None, languages: Optional[List[str]] = None) -> str:
     """Extract text from a PDF file using EasyOCR (backward compatibility)"""
-    return OCRCore.read_text_from_pdf(pdf_path, num_pages, min_confidence, use_cache, batch_size)
\ No newline at end of file
+    return OCRCore.read_text_from_pdf(pdf_path, num_pages, min_confidence, use_cache, batch_size, languages)
@@ -5,13 +5,16 @@ from typing import Any
 import json
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+import orjson
 import uvicorn
 
-from mcp_vision.server import mcp
-from mcp_vision.core import init_ocr_reader
+from mcp_vision.core import OCR_PRELOAD
+from mcp_vision.server import mcp, start_ocr_runtime
+from mcp_vision.utils import configure_logging
 
 logger = logging.getLogger(__name__)
 
@@ -23,26 +26,70 @@ class ToolResponse(BaseModel):
     content: list[dict[str, Any]]
     isError: bool = False
 
+class ToolInfo(BaseModel):
+    name: str
+    description: str = ""
+    inputSchema: dict[str, Any]
+
+class ToolsListResponse(BaseModel):
+    tools: list[ToolInfo]
+
+async def build_tools_payload() -> bytes:
+    """Serialize the registered MCP tools once; the registry is static after startup"""
+    tools_list = await mcp._list_tools()
+    # Extract only serializable information from tools
+    tools = []
+    for tool in tools_list:
+        # FastMCP tools have the schema in different places
+        # Try to extract it from various possible attributes
+        schema = None
+        if hasattr(tool, 'parameters'):
+            # FunctionTool has parameters
+            schema = tool.parameters
+        elif hasattr(tool, 'input_schema'):
+            schema = tool.input_schema
+        elif hasattr(tool, 'inputSchema'):
+            schema = tool.inputSchema
+        
+        # If we found a schema, use it; otherwise fall back to a basic one
+        if not schema:
+            schema = {
+                "type": "object",
+                "properties": {}
+            }
+        
+        tools.append(ToolInfo(
+            name=tool.name,
+            description=tool.description if tool.description else "",
+            inputSchema=schema,
+        ))
+    return orjson.dumps(ToolsListResponse(tools=tools).model_dump())
+
 @asynccontextmanager
 async def app_lifespan(app: FastAPI):
     """Manage application lifecycle"""
     logger.info("Starting HTTP MCP-vision server...")
+    app.state.warmup_task = None
     try:
-        # Initialize OCR reader
-        init_ocr_reader()
+        app.state.warmup_task = await start_ocr_runtime()
+        app.state.tools_payload = await build_tools_payload()
         logger.info("MCP-vision HTTP server started successfully")
         yield
     except Exception as e:
         logger.error(f"Failed to initialize server: {e}")
         raise e
     finally:
+        # The warmup task is held here for the server's lifetime; stop waiting on it at shutdown
+        if app.state.warmup_task is not None:
+            app.state.warmup_task.cancel()
         logger.info("MCP-vision HTTP server shutting down")
 
 app = FastAPI(
     title="MCP Vision Server",
     description="HTTP API for MCP Vision tools",
     version="0.1.1",
-    lifespan=app_lifespan
+    lifespan=app_lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -56,76 +103,69 @@ app.add_middleware(
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "mcp-vision"}
+    """Health check endpoint; warmed turns true once the background warmup succeeded,
+    or straight away when only the startup preload was requested"""
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is None:
+        # The preload finishes before the server accepts requests
+        warmed = bool(OCR_PRELOAD)
+    else:
+        warmed = (warmup_task.done() and not warmup_task.cancelled()
+                  and warmup_task.exception() is None and warmup_task.result())
+    return {"status": "healthy", "service": "mcp-vision", "warmed": warmed}
 
-@app.get("/tools")
+@app.get("/tools", response_model=ToolsListResponse)
 async def list_tools():
     """List available MCP tools"""
     try:
-        tools_list = await mcp._list_tools()
-        # Extract only serializable information from tools
-        tools = []
-        for tool in tools_list:
-            tool_dict = {
-                "name": tool.name,
-                "description": tool.description if tool.description else ""
-            }
-            
-            # FastMCP tools have the schema in different places
-            # Try to extract it from various possible attributes
-            schema = None
-            if hasattr(tool, 'parameters'):
-                # FunctionTool has parameters
-                schema = tool.parameters
-            elif hasattr(tool, 'input_schema'):
-                schema = tool.input_schema
-            elif hasattr(tool, 'inputSchema'):
-                schema = tool.inputSchema
-            
-            # If we found a schema, use it; otherwise create a basic one
-            if schema:
-                tool_dict["inputSchema"] = schema
-            else:
-                # Fallback to a basic schema
-                tool_dict["inputSchema"] = {
-                    "type": "object",
-                    "properties": {}
-                }
-            
-            tools.append(tool_dict)
-        return {"tools": tools}
+        payload = getattr(app.state, "tools_payload", None)
+        if payload is None:
+            # Lifespan did not run (e.g. app mounted without it); build lazily
+            payload = app.state.tools_payload = await build_tools_payload()
+        return Response(content=payload, media_type="application/json")
     except Exception as e:
         logger.error(f"Error listing tools: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/call/{tool_name}")
-async def call_tool(tool_name: str, arguments: dict[str, Any]):
-    """Call an MCP tool by name"""
+async def _dispatch(tool_name: str, arguments: dict[str, Any]) -> ORJSONResponse:
+    """Run an MCP tool and wrap its result; shared by the /call and /invoke routes"""
     try:
         # Call the tool using FastMCP's _call_tool method
         result = await mcp._call_tool(tool_name, arguments)
         
-        # Convert result to JSON-serializable format
+        # Convert result to JSON-serializable format; MCP content blocks are pydantic
+        # models, so dump their fields rather than embedding their repr in a string
         if hasattr(result, 'content'):
-            content = [{"type": "text", "text": str(item)} for item in result.content]
+            content = [
+                item.model_dump(mode="json", by_alias=True, exclude_none=True)
+                if hasattr(item, 'model_dump') else {"type": "text", "text": str(item)}
+                for item in result.content
+            ]
         else:
             content = [{"type": "text", "text": str(result)}]
         
-        return ToolResponse(content=content)
+        return ORJSONResponse({"content": content, "isError": False})
         
     except Exception as e:
         logger.error(f"Error calling tool {tool_name}: {e}")
         error_content = [{"type": "text", "text": f"Error: {str(e)}"}]
-        return ToolResponse(content=error_content, isError=True)
+        return ORJSONResponse({"content": error_content, "isError": True})
+
+# Payloads are plain dicts handed straight to ORJSONResponse; ToolResponse only
+# documents the shape so FastAPI skips response validation and jsonable_encoder.
+@app.post("/call/{tool_name}", response_model=None, responses={200: {"model": ToolResponse}})
+async def call_tool(tool_name: str, arguments: dict[str, Any]) -> ORJSONResponse:
+    """Call an MCP tool by name"""
+    return await _dispatch(tool_name, arguments)
 
-@app.post("/invoke")
-async def invoke_tool(request: ToolRequest):
+@app.post("/invoke", response_model=None, responses={200: {"model": ToolResponse}})
+async def invoke_tool(request: ToolRequest) -> ORJSONResponse:
     """Generic tool invocation endpoint"""
-    return await call_tool(request.tool, request.arguments)
+    return await _dispatch(request.tool, request.arguments)
 
 def main():
     """Entry point for HTTP server"""
+    configure_logging()
     port = int(os.environ.get("PORT", 8080))
     host = os.environ.get("HOST", "0.0.0.0")
     
@@ -135,8 +175,14 @@ def main():
         "mcp_vision.http_server:app",
         host=host,
         port=port,
+        workers=int(os.environ.get("WORKERS", 1)),
+        # uvloop and httptools when installed (uvicorn[standard], except uvloop on
+        # Windows), falling back to asyncio and h11 otherwise
+        loop="auto",
+        http="auto",
         reload=False,
-        access_log=True
+        # Per-request access logging synchronizes on stdout; opt in with ACCESS_LOG=1
+        access_log=os.environ.get("ACCESS_LOG", "0") == "1"
     )
 
 if __name__ == "__main__":
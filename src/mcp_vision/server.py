@@ -1,26 +1,57 @@
+import asyncio
 from contextlib import asynccontextmanager
 import logging
+import sys
+from typing import Optional
 
 from fastmcp import FastMCP
 
-from mcp_vision.core import init_ocr_reader, read_text_from_image, read_text_from_pdf
+# Imported under core_ names because the tools below reuse the plain names
+from mcp_vision.core import (
+    OCR_PRELOAD,
+    OCR_WARMUP,
+    init_ocr_reader,
+    warmup_ocr_reader,
+    read_text_from_image as core_read_text_from_image,
+    read_text_from_pdf as core_read_text_from_pdf,
+)
 from mcp_vision.cache import get_cache
+from mcp_vision.utils import configure_logging, configure_worker_threads
 
 logger = logging.getLogger(__name__)
 
+async def start_ocr_runtime() -> Optional[asyncio.Task]:
+    """Prepare OCR for serving; shared by the MCP and HTTP server lifespans.
+
+    Returns:
+        The background warmup task when OCR_WARMUP is enabled, otherwise None.
+        The caller must keep a reference to it for the server's lifetime
+    """
+    configure_worker_threads()
+    # initialize global EasyOCR reader on startup, off the event loop (model loading is slow disk I/O)
+    if OCR_PRELOAD:
+        await asyncio.get_running_loop().run_in_executor(None, init_ocr_reader)
+    # Warm up in the background so startup is not held up by the dummy OCR pass
+    return asyncio.create_task(asyncio.to_thread(warmup_ocr_reader)) if OCR_WARMUP else None
+
+
 @asynccontextmanager
 async def app_lifespan(server: FastMCP):
     """Manage application lifecycle with type-safe context"""
     logger.info("Starting up MCP-vision server and loading EasyOCR reader...")
     try:
-        # initialize global EasyOCR reader on startup
-        init_ocr_reader()
+        warmup_task = await start_ocr_runtime()
     except Exception as e:
         logger.error(f"Failed to initialize OCR reader: {e}")
         raise e
 
     logger.info("MCP-vision server has started, listening for requests...")
-    yield
+    try:
+        yield
+    finally:
+        # The warmup task is held here for the server's lifetime; stop waiting on it at shutdown
+        if warmup_task is not None:
+            warmup_task.cancel()
 
 
 mcp = FastMCP(
@@ -30,7 +61,7 @@ mcp = FastMCP(
 
 
 @mcp.tool()
-def read_text_from_image(image_path: str, min_confidence: float = 0.0, use_cache: bool = True) -> str:
+async def read_text_from_image(image_path: str, min_confidence: float = 0.0, use_cache: bool = True, languages: list[str] = None) -> str:
     """Extract text from an image using EasyOCR.
 
     Args:
@@ -38,13 +69,15 @@ def read_text_from_image(image_path: str, min_confidence: float = 0.0, use_cache
         min_confidence (optional): minimum confidence threshold for text recognition (default: 0.0)
                                  Use 0.0 to include all recognized text, even low confidence
         use_cache (optional): whether to use caching (default: True)
+        languages (optional): EasyOCR language codes to recognize (default: ["en", "th"])
+                            A reader is loaded once per language set and kept for reuse
     """
-    from mcp_vision.core import read_text_from_image as core_read_text_from_image
-    return core_read_text_from_image(image_path, min_confidence, use_cache)
+    # OCR blocks for hundreds of milliseconds; keep it off the event loop
+    return await asyncio.to_thread(core_read_text_from_image, image_path, min_confidence, use_cache, languages)
 
 
 @mcp.tool()
-def read_text_from_pdf(pdf_path: str, num_pages: int = None, min_confidence: float = 0.0, use_cache: bool = True, batch_size: int = None) -> str:
+async def read_text_from_pdf(pdf_path: str, num_pages: int = None, min_confidence: float = 0.0, use_cache: bool = True, batch_size: int = None, languages: list[str] = None) -> str:
     """Extract text from a PDF file by converting each page to an image and using EasyOCR.
 
     Args:
@@ -53,22 +86,27 @@ def read_text_from_pdf(pdf_path: str, num_pages: int = None, min_confidence: flo
         min_confidence (optional): minimum confidence threshold for text recognition (default: 0.0)
                                  Use 0.0 to include all recognized text, even low confidence
         use_cache (optional): whether to use caching (default: True)
-        batch_size (optional): number of pages to process simultaneously (default: from BATCH_SIZE env var or 1)
-                             Set to 1 for sequential processing, higher values (e.g., 4) for parallel processing
+        batch_size (optional): number of pages to OCR per batched EasyOCR call (default: from BATCH_SIZE env var or 1)
+                             Set to 1 to process one page at a time, higher values (e.g., 4) to batch pages together
+                             Values above 1 also render pages in a shared pool of one worker process per CPU core,
+                             rendering the next batch while the current one is OCRed
+        languages (optional): EasyOCR language codes to recognize (default: ["en", "th"])
+                            A reader is loaded once per language set and kept for reuse
     
     Returns:
         Concatenated text from all processed pages
     """
-    from mcp_vision.core import read_text_from_pdf as core_read_text_from_pdf
-    return core_read_text_from_pdf(pdf_path, num_pages, min_confidence, use_cache, batch_size)
+    # Rendering and OCR block for seconds on large documents; keep them off the event loop
+    return await asyncio.to_thread(core_read_text_from_pdf, pdf_path, num_pages, min_confidence, use_cache, batch_size, languages)
 
 
 @mcp.tool()
-def clear_ocr_cache() -> str:
+async def clear_ocr_cache() -> str:
     """Clear all cached OCR results"""
     try:
         cache = get_cache()
-        cache.clear()
+        # Deleting every row can take a while on a large database and waits on the cache lock
+        await asyncio.to_thread(cache.clear)
         return "OCR cache cleared successfully"
     except Exception as e:
         logger.error(f"Error clearing cache: {e}")
@@ -76,11 +114,11 @@ def clear_ocr_cache() -> str:
 
 
 @mcp.tool()
-def get_cache_stats() -> str:
+async def get_cache_stats() -> str:
     """Get statistics about the OCR cache"""
     try:
         cache = get_cache()
-        count, size_mb = cache.get_stats()
+        count, size_mb = await asyncio.to_thread(cache.get_stats)
         return f"Cache contains {count} entries, occupying {size_mb:.2f} MB"
     except Exception as e:
         logger.error(f"Error getting cache stats: {e}")
@@ -89,8 +127,13 @@ def get_cache_stats() -> str:
 
 def main():
     """Entry point for the MCP server"""
-    # Run the MCP server with stdio transport
-    mcp.run()
+    configure_logging()
+    try:
+        # Run the MCP server with stdio transport
+        mcp.run(transport="stdio")
+    except Exception as e:
+        logger.error(f"Error starting server: {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,17 +1,89 @@
+import asyncio
 import base64
 import io
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio.to_thread
 import requests
+from requests.adapters import HTTPAdapter
 
 from PIL import Image as PILImage
 from mcp.server.fastmcp import Image as MCPImage
 
+# Prefixes identifying a path as a URL; str.startswith checks a tuple in one call
+URL_PREFIXES = ("http://", "https://")
+
+# Timeout in seconds for image and PDF downloads
+HTTP_TIMEOUT = 30
+
+# Threads available to blocking tool calls; OCR is CPU-bound, so more threads than
+# cores only oversubscribe torch's own thread pool
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", os.cpu_count() or 1))
+
+# Shared HTTP session, so repeated downloads reuse pooled keep-alive connections
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+
+def configure_logging():
+    """
+    Configure root logging at the level named by the LOG_LEVEL env var (default: INFO).
+    """
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+
+def configure_worker_threads():
+    """
+    Size the thread pools that run blocking tool calls to OCR_WORKERS.
+
+    Must be called from the running event loop. Covers both asyncio.to_thread
+    (the loop's default executor) and Starlette's threadpool for sync handlers.
+    """
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr-worker")
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = OCR_WORKERS
+
 
-def pil_to_base64(image: PILImage.Image) -> str:
-    buffered = io.BytesIO()
-    image.save(buffered, format="JPEG")
-    img_str = base64.b64encode(buffered.getvalue())
-    return img_str
+def get_http_session() -> requests.Session:
+    """
+    Get the shared HTTP session used for all URL downloads.
+    """
+    return _session
+
+
+# Largest base64 image payload pil_to_base64 produces, and the JPEG qualities it tries
+MAX_BASE64_BYTES = 500 * 1024
+JPEG_QUALITIES = (85, 75, 60, 45, 30)
+
+
+def pil_to_base64(image: PILImage.Image, max_bytes: int = MAX_BASE64_BYTES) -> bytes:
+    """
+    Encode an image as base64 JPEG, lowering quality (and finally size) to fit max_bytes.
+    Raises ValueError if even a 256px image at the lowest quality is larger than max_bytes.
+    """
+    with io.BytesIO() as buffered:
+        while True:
+            for quality in JPEG_QUALITIES:
+                buffered.seek(0)
+                buffered.truncate()
+                # Single-pass baseline encoding; Huffman optimization is slow and saves little
+                image.save(buffered, format="JPEG", quality=quality, optimize=False, progressive=False)
+                img_str = base64.b64encode(buffered.getvalue())
+                if len(img_str) <= max_bytes:
+                    return img_str
+            if max(image.size) <= 256:
+                raise ValueError(f"Image does not fit in {max_bytes} base64 bytes, even at "
+                                 f"{image.width}x{image.height} and JPEG quality {JPEG_QUALITIES[-1]}")
+            # Still too large at the lowest quality: halve the dimensions and retry
+            image = image.resize((max(image.width // 2, 1), max(image.height // 2, 1)))
 
 
 def base64_to_pil(data_base64: str) -> PILImage.Image:
@@ -19,14 +91,20 @@ def base64_to_pil(data_base64: str) -> PILImage.Image:
     return image
 
 
+def fetch_url_bytes(url: str) -> bytes:
+    """
+    Download the body of a URL with the shared HTTP session.
+    """
+    response = _session.get(url, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
 def retrieve_image_from_url(image_url: str) -> PILImage.Image:
     """
     Retrieve an image from a given URL and return it as a PIL Image object.
     """
-    response = requests.get(image_url)
-    response.raise_for_status()
-    image_data = io.BytesIO(response.content)
-    return PILImage.open(image_data)
+    return PILImage.open(io.BytesIO(fetch_url_bytes(image_url)))
 
 
 def load_image(image: str | bytes | io.BufferedReader) -> PILImage.Image:
@@ -46,7 +124,7 @@ def load_image(image: str | bytes | io.BufferedReader) -> PILImage.Image:
         return PILImage.open(io.BytesIO(image))
     elif os.path.isfile(image):
         return PILImage.open(image)
-    elif image.startswith("http://") or image.startswith("https://"):
+    elif image.startswith(URL_PREFIXES):
         return retrieve_image_from_url(image)
     else:
         raise ValueError(f"Invalid image path or URL: {image}")
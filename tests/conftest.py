@@ -0,0 +1,12 @@
+import os
+
+# Keep OCR inference single-threaded in tests: concurrent test calls and
+# pytest-xdist workers already occupy the cores, and per-call OpenMP/MKL thread
+# pools on top of them only oversubscribe. Must run before torch or easyocr import
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
+# Load EasyOCR readers on the first OCR call rather than at server startup, so runs
+# that deselect the slow OCR tests never load (or download) a model
+os.environ.setdefault("OCR_PRELOAD", "0")
@@ -0,0 +1,274 @@
+import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz
+import numpy as np
+import pytest
+
+from mcp_vision import core
+from mcp_vision.cache import OCRCache
+from mcp_vision.core import OCRCore
+
+
+class FakeReader:
+    """Stands in for easyocr.Reader, answering each image with its own shape"""
+
+    def __init__(self, error=None, drop_one=False):
+        self.calls = []
+        self.error = error
+        self.drop_one = drop_one
+
+    def _result(self, image):
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], "x".join(map(str, image.shape)), 0.9)]
+
+    def readtext(self, image, **kwargs):
+        self.calls.append(("readtext", [image.shape]))
+        if self.error:
+            raise self.error
+        return self._result(image)
+
+    def readtext_batched(self, images, **kwargs):
+        self.calls.append(("readtext_batched", [image.shape for image in images]))
+        if self.error:
+            raise self.error
+        results = [self._result(image) for image in images]
+        return results[:-1] if self.drop_one else results
+
+
+class TestImageCoalescing:
+    """Test the queue that batches concurrent single-image OCR requests"""
+
+    @pytest.fixture
+    def drains(self, monkeypatch):
+        """Futures of the drains scheduled on the inference thread, which is kept out of
+        the way so a test can queue requests and then drain them itself"""
+        scheduled = []
+
+        def submit(fn, *args, **kwargs):
+            scheduled.append(Future())
+            return scheduled[-1]
+
+        monkeypatch.setattr(OCRCore, "_submit_inference", staticmethod(submit))
+        monkeypatch.setattr(core, "MAX_COALESCE", 4)
+        yield scheduled
+        core._pending_images.clear()
+
+    def test_same_shape_images_share_one_call(self, drains):
+        """Test that queued images of one size and reader go through one batched call"""
+        reader = FakeReader()
+        futures = [OCRCore._submit_image(reader, np.zeros((20, 30), dtype=np.uint8)) for _ in range(3)]
+        assert len(drains) == 1
+
+        OCRCore._drain_pending_images()
+
+        assert reader.calls == [("readtext_batched", [(20, 30)] * 3)]
+        assert [future.result(timeout=0)[0][1] for future in futures] == ["20x30"] * 3
+
+    def test_mixed_shapes_are_grouped(self, drains):
+        """Test that each image size gets its own call and each caller its own result"""
+        reader = FakeReader()
+        shapes = [(20, 30), (40, 10), (20, 30)]
+        futures = [OCRCore._submit_image(reader, np.zeros(shape, dtype=np.uint8)) for shape in shapes]
+
+        OCRCore._drain_pending_images()
+
+        assert reader.calls == [("readtext_batched", [(20, 30), (20, 30)]), ("readtext", [(40, 10)])]
+        assert [future.result(timeout=0)[0][1] for future in futures] == ["20x30", "40x10", "20x30"]
+
+    def test_errors_reach_every_caller(self, drains):
+        """Test that a failed call fails all its requests and leaves other groups alone"""
+        failing, working = FakeReader(error=ValueError("boom")), FakeReader()
+        failed = [OCRCore._submit_image(failing, np.zeros((20, 30), dtype=np.uint8)) for _ in range(2)]
+        served = OCRCore._submit_image(working, np.zeros((20, 30), dtype=np.uint8))
+
+        OCRCore._drain_pending_images()
+
+        for future in failed:
+            with pytest.raises(ValueError, match="boom"):
+                future.result(timeout=0)
+        assert served.result(timeout=0)[0][1] == "20x30"
+
+    def test_missing_results_fail_the_chunk(self, drains):
+        """Test that a batched call returning too few results fails instead of hanging"""
+        reader = FakeReader(drop_one=True)
+        futures = [OCRCore._submit_image(reader, np.zeros((20, 30), dtype=np.uint8)) for _ in range(2)]
+
+        OCRCore._drain_pending_images()
+
+        for future in futures:
+            with pytest.raises(RuntimeError, match="1 results for 2 images"):
+                future.result(timeout=0)
+
+    def test_drain_that_never_ran_fails_the_queue(self, drains):
+        """Test that queued requests fail when their drain job itself fails"""
+        future = OCRCore._submit_image(FakeReader(), np.zeros((20, 30), dtype=np.uint8))
+
+        drains[0].set_exception(ImportError("no torch"))
+
+        with pytest.raises(ImportError, match="no torch"):
+            future.result(timeout=0)
+        assert not core._pending_images
+
+
+def write_pdf(path, widths):
+    """Write a blank PDF with one page per width, so each page renders to its own shape"""
+    doc = fitz.open()
+    for width in widths:
+        doc.new_page(width=width, height=300)
+    doc.save(path)
+    doc.close()
+
+
+def page_shapes(result):
+    """Page texts of a read_text_from_pdf result, which the fake reader makes image shapes"""
+    return [line for line in result.splitlines() if line and not line.startswith("---")]
+
+
+def ocr_image_count(reader):
+    """Number of images a fake reader has been asked to OCR"""
+    return sum(len(shapes) for _, shapes in reader.calls)
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch, tmp_path):
+    """Route OCR to a fake reader (run on the real inference thread) and cache to a
+    fresh database; returns the reader"""
+    reader = FakeReader()
+    cache = OCRCache(str(tmp_path / "ocr_cache.db"))
+    monkeypatch.setattr(OCRCore, "get_reader", staticmethod(lambda languages=None: reader))
+    monkeypatch.setattr(core, "_inference_call", lambda fn, *args, **kwargs: fn(*args, **kwargs))
+    monkeypatch.setattr(core, "get_cache", lambda *args, **kwargs: cache)
+    return reader
+
+
+class TestPdfCaching:
+    """Test the whole-document and per-page PDF result caches"""
+
+    def test_larger_page_count_only_ocrs_missing_pages(self, fake_ocr, tmp_path):
+        """Test that pages OCRed by a shorter read are reused by a longer one"""
+        pdf = str(tmp_path / "doc.pdf")
+        write_pdf(pdf, [200, 210, 220])
+
+        first = OCRCore.read_text_from_pdf(pdf, num_pages=1)
+        assert ocr_image_count(fake_ocr) == 1
+        full = OCRCore.read_text_from_pdf(pdf)
+
+        assert ocr_image_count(fake_ocr) == 3
+        assert page_shapes(full)[:1] == page_shapes(first)
+        assert len(page_shapes(full)) == 3
+        # Served from the whole-document row without any OCR
+        assert OCRCore.read_text_from_pdf(pdf) == full
+        assert ocr_image_count(fake_ocr) == 3
+
+    def test_edit_in_place_invalidates(self, fake_ocr, tmp_path):
+        """Test that rewriting a PDF at the same path is OCRed again"""
+        pdf = str(tmp_path / "doc.pdf")
+        write_pdf(pdf, [200, 210])
+        before = OCRCore.read_text_from_pdf(pdf)
+
+        write_pdf(pdf, [230, 240, 250])
+        after = OCRCore.read_text_from_pdf(pdf)
+
+        assert after != before
+        assert len(page_shapes(after)) == 3
+        assert ocr_image_count(fake_ocr) == 5
+
+    def test_zero_pages_does_not_poison_full_reads(self, fake_ocr, tmp_path):
+        """Test that an empty num_pages=0 result is not served for a full read"""
+        pdf = str(tmp_path / "doc.pdf")
+        write_pdf(pdf, [200, 210])
+
+        assert OCRCore.read_text_from_pdf(pdf, num_pages=0) == ""
+        assert len(page_shapes(OCRCore.read_text_from_pdf(pdf))) == 2
+
+    def test_url_hit_skips_download(self, fake_ocr, tmp_path, monkeypatch):
+        """Test that a URL read before is answered without downloading it again"""
+        pdf = str(tmp_path / "doc.pdf")
+        write_pdf(pdf, [200, 210])
+        downloads = []
+
+        def download(url):
+            downloads.append(url)
+            copy = tmp_path / f"download{len(downloads)}.pdf"
+            copy.write_bytes(open(pdf, "rb").read())
+            return str(copy)
+
+        monkeypatch.setattr(OCRCore, "_download_pdf", staticmethod(download))
+        url = "https://example.com/doc.pdf"
+        first = OCRCore.read_text_from_pdf(url)
+        second = OCRCore.read_text_from_pdf(url)
+
+        assert second == first
+        assert len(downloads) == 1
+        # The temporary download is removed once read
+        assert not (tmp_path / "download1.pdf").exists()
+
+
+class TestPdfRenderPool:
+    """Test batched PDF reads, which render pages in the shared worker pool"""
+
+    @pytest.fixture(autouse=True)
+    def render_pool(self):
+        """Shut down any rendering pool a test started"""
+        yield
+        if core._render_pool is not None:
+            core._render_pool.shutdown()
+            core._render_pool = None
+
+    def test_batched_matches_sequential(self, fake_ocr, tmp_path):
+        """Test that batched pages come back in order, as one page at a time would"""
+        pdf = str(tmp_path / "doc.pdf")
+        write_pdf(pdf, [200, 210, 220])
+
+        sequential = OCRCore.read_text_from_pdf(pdf, use_cache=False, batch_size=1)
+        batched = OCRCore.read_text_from_pdf(pdf, use_cache=False, batch_size=2)
+
+        assert batched == sequential
+        assert len(page_shapes(batched)) == 3
+
+    def test_broken_pool_is_replaced(self, fake_ocr, tmp_path):
+        """Test that a pool whose worker died is discarded, and the next read gets a new one"""
+        pdf = str(tmp_path / "doc.pdf")
+        write_pdf(pdf, [200, 210])
+        expected = OCRCore.read_text_from_pdf(pdf, use_cache=False, batch_size=1)
+
+        pool = core._get_render_pool()
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+        failed = OCRCore.read_text_from_pdf(pdf, use_cache=False, batch_size=2)
+
+        assert failed.startswith("Error occurred while extracting text from PDF")
+        assert core._render_pool is not pool
+        assert OCRCore.read_text_from_pdf(pdf, use_cache=False, batch_size=2) == expected
+
+    def test_keep_open_false_leaves_no_document_open(self, tmp_path, monkeypatch):
+        """Test that rendering a temporary download doesn't hold it open in the worker"""
+        pdf = str(tmp_path / "doc.pdf")
+        write_pdf(pdf, [200])
+        monkeypatch.setattr(core, "_render_doc", None)
+        monkeypatch.setattr(core, "_render_doc_id", None)
+
+        closed = core._render_page_worker(pdf, 0, keep_open=False)
+        assert core._render_doc is None
+        kept = core._render_page_worker(pdf, 0)
+        assert core._render_doc is not None
+        core._render_doc.close()
+
+        np.testing.assert_array_equal(closed, kept)
+
+    def test_batched_url_download_is_removed(self, fake_ocr, tmp_path, monkeypatch):
+        """Test that a batched read of a URL matches the local file and deletes its download"""
+        pdf = str(tmp_path / "doc.pdf")
+        write_pdf(pdf, [200, 210, 220])
+        download = tmp_path / "download.pdf"
+
+        def download_pdf(url):
+            download.write_bytes(open(pdf, "rb").read())
+            return str(download)
+
+        monkeypatch.setattr(OCRCore, "_download_pdf", staticmethod(download_pdf))
+        result = OCRCore.read_text_from_pdf("https://example.com/doc.pdf", use_cache=False, batch_size=2)
+
+        assert result == OCRCore.read_text_from_pdf(pdf, use_cache=False, batch_size=1)
+        assert not download.exists()
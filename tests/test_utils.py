@@ -0,0 +1,58 @@
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from mcp_vision.utils import JPEG_QUALITIES, pil_to_base64
+
+
+def noise_image(size):
+    """An image of random pixels, which JPEG compresses poorly"""
+    pixels = np.random.default_rng(0).integers(0, 256, (size, size, 3), dtype=np.uint8)
+    return Image.fromarray(pixels)
+
+
+def encoded_size(image, quality):
+    """Base64 length of an image saved as JPEG at a quality"""
+    with io.BytesIO() as buffered:
+        image.save(buffered, format="JPEG", quality=quality, optimize=False, progressive=False)
+        return len(base64.b64encode(buffered.getvalue()))
+
+
+def decode(data):
+    """Image decoded from a base64 JPEG payload"""
+    return Image.open(io.BytesIO(base64.b64decode(data)))
+
+
+class TestPilToBase64:
+    """Test fitting images into a base64 byte budget"""
+
+    def test_small_image_keeps_first_quality(self):
+        """Test that an image within budget is encoded once, at the highest quality"""
+        image = noise_image(64)
+        data = pil_to_base64(image)
+        assert len(data) == encoded_size(image, JPEG_QUALITIES[0])
+        assert decode(data).size == (64, 64)
+
+    def test_lowers_quality_before_resizing(self):
+        """Test that the first quality fitting the budget is used, at full size"""
+        image = noise_image(512)
+        budget = encoded_size(image, JPEG_QUALITIES[2])
+        data = pil_to_base64(image, max_bytes=budget)
+        assert len(data) == budget
+        assert decode(data).size == (512, 512)
+
+    def test_halves_size_when_quality_is_not_enough(self):
+        """Test that the image is halved once the lowest quality is still too large"""
+        image = noise_image(1024)
+        budget = encoded_size(image, JPEG_QUALITIES[-1]) - 1
+        data = pil_to_base64(image, max_bytes=budget)
+        assert len(data) <= budget
+        assert decode(data).size == (512, 512)
+
+    def test_raises_when_nothing_fits(self):
+        """Test that an unreachable budget raises instead of returning an oversized payload"""
+        with pytest.raises(ValueError, match="does not fit in 100 base64 bytes"):
+            pil_to_base64(noise_image(512), max_bytes=100)
@@ -1,130 +1,207 @@
 import pytest
 import pytest_asyncio
 import asyncio
+import logging
 import os
 from pathlib import Path
 from fastmcp import Client
+from PIL import Image
+from mcp_vision import core
+from mcp_vision.core import OCRCore
 from mcp_vision.server import mcp
 
+# Extracted text is logged at DEBUG: see it with --log-cli-level=DEBUG, or in the
+# captured log of a failing test
+logger = logging.getLogger(__name__)
+
+# Sample files, checked once at import so tests without them are skipped before
+# any fixture (and the MCP client handshake) is set up
+IMAGES_DIR = Path(__file__).resolve().parent.parent / "images"
+SAMPLE_FILES = {
+    "image": IMAGES_DIR / "sample.png",
+    "pdf": IMAGES_DIR / "sample.pdf",
+}
+SAMPLES_PRESENT = {name: path.exists() for name, path in SAMPLE_FILES.items()}
+
+# Language lists sent to the tools (lists, since they cross the JSON boundary)
+LANGS_EN = ["en"]
+
+# OCR test cases: (id, tool, sample file, extra tool arguments)
+OCR_CASES = [
+    ("image-en", "read_text_from_image", "image", {"languages": LANGS_EN}),
+    # Default languages (English and Thai)
+    ("image-default-languages", "read_text_from_image", "image", {}),
+    # Limit to first page for faster testing
+    ("pdf", "read_text_from_pdf", "pdf", {"num_pages": 1}),
+]
+
+# Tool argument naming each sample file's path
+PATH_ARGUMENTS = {"image": "image_path", "pdf": "pdf_path"}
+
+# Set when running under pytest-xdist, where each worker runs only some of the tests
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+
+
+def _text(result):
+    """Text of a tool result's first content item, or "" if it has none"""
+    return result.content[0].text if result.content else ""
+
+
+def _assert_has_content(result):
+    """Assert that a tool result carries at least one content item"""
+    assert result.content is not None
+    assert len(result.content) > 0
+
+
+def requires_sample(name):
+    """Skip marker for tests that need a sample file"""
+    return pytest.mark.skipif(not SAMPLES_PRESENT[name], reason=f"Sample {name} not found at {SAMPLE_FILES[name]}")
+
 
 class TestVisionTools:
     """Test suite for MCP vision tools using FastMCP client"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def sample_files(self):
         """Get paths to sample files"""
-        base_dir = Path(__file__).parent.parent
-        return {
-            "image": base_dir / "images" / "sample.png",
-            "pdf": base_dir / "images" / "sample.pdf",
-        }
+        return SAMPLE_FILES
+
+    @pytest.fixture(scope="session")
+    def ocr_inputs(self, tmp_path_factory, sample_files):
+        """Sample files as sent to the tools: the image is downscaled once to at most
+        1024px on its longest edge, which keeps text legible at a fraction of the OCR work"""
+        inputs = dict(sample_files)
+        if SAMPLES_PRESENT["image"]:
+            with Image.open(sample_files["image"]) as image:
+                image.thumbnail((1024, 1024), Image.LANCZOS)
+                inputs["image"] = tmp_path_factory.mktemp("ocr") / "sample_small.png"
+                image.save(inputs["image"])
+        return inputs
 
-    @pytest_asyncio.fixture
+    @pytest_asyncio.fixture(scope="session")
     async def client(self):
-        """Create FastMCP client for testing"""
+        """Create one FastMCP client shared by every test, so the server starts once"""
         async with Client(mcp) as client:
             yield client
 
-    @pytest.mark.asyncio
-    async def test_read_text_from_image(self, client, sample_files):
-        """Test reading text from image file"""
-        image_path = str(sample_files["image"])
-        
-        # Check if sample image exists
-        if not os.path.exists(image_path):
-            pytest.skip(f"Sample image not found at {image_path}")
-        
-        # Test reading text from image
-        result = await client.call_tool("read_text_from_image", {
-            "image_path": image_path
-        })
-        
-        # Verify we got a result
-        assert result.content is not None
-        assert len(result.content) > 0
-        
-        # Extract text from result
-        extracted_text = result.content[0].text if result.content else ""
-        
-        # Print the extracted text for manual verification
-        print(f"\nExtracted text from image:\n{extracted_text}")
-        
-        # Basic validation - should not be empty for a real image
-        assert isinstance(extracted_text, str)
+    @pytest_asyncio.fixture(scope="session")
+    async def warmup(self, client, tmp_path_factory):
+        """Load and exercise each language set's reader on a small blank image, so the
+        first real OCR test measures steady-state speed"""
+        blank = tmp_path_factory.mktemp("warmup") / "blank.png"
+        Image.new("RGB", (32, 32), "white").save(blank)
+        # The OCR cases use English alone and the default languages
+        calls = []
+        for languages in (LANGS_EN, None):
+            arguments = {"image_path": str(blank), "use_cache": False}
+            if languages is not None:
+                arguments["languages"] = languages
+            calls.append(client.call_tool("read_text_from_image", arguments))
+        await asyncio.gather(*calls)
 
-    @pytest.mark.asyncio
-    async def test_read_text_from_pdf(self, client, sample_files):
-        """Test reading text from PDF file"""
-        pdf_path = str(sample_files["pdf"])
-        
-        # Check if sample PDF exists
-        if not os.path.exists(pdf_path):
-            pytest.skip(f"Sample PDF not found at {pdf_path}")
-        
-        # Test reading text from PDF
-        result = await client.call_tool("read_text_from_pdf", {
-            "pdf_path": pdf_path,
-            "num_pages": 1  # Limit to first page for faster testing
-        })
+    @pytest.fixture(scope="session")
+    def ocr_tasks(self):
+        """Tool calls started by ocr_results, by case id"""
+        return {}
+
+    @pytest.fixture
+    def ocr_idle(self, ocr_tasks):
+        """Returns a coroutine function waiting for every OCR call already started, so
+        a test can patch the OCR pipeline without breaking a call still in flight"""
+        async def wait():
+            await asyncio.gather(*ocr_tasks.values(), return_exceptions=True)
+        return wait
+
+    @pytest_asyncio.fixture(scope="session")
+    async def ocr_results(self, client, warmup, ocr_inputs, ocr_tasks):
+        """Returns a coroutine function giving each OCR case's result, calling the tool
+        once per case. In a single process every case starts at once, so the suite waits
+        for the slowest call rather than all of them; under pytest-xdist a worker only
+        starts the cases it is handed"""
+        cases = {case[0]: case for case in OCR_CASES}
+
+        def start(case_id):
+            if case_id not in ocr_tasks:
+                _, tool, file_key, arguments = cases[case_id]
+                ocr_tasks[case_id] = asyncio.ensure_future(client.call_tool(
+                    tool, {PATH_ARGUMENTS[file_key]: str(ocr_inputs[file_key]), **arguments}
+                ))
+            return ocr_tasks[case_id]
+
+        if XDIST_WORKER is None:
+            for case_id, _, file_key, _ in OCR_CASES:
+                if SAMPLES_PRESENT[file_key]:
+                    start(case_id)
+
+        async def result(case_id):
+            return await start(case_id)
+
+        yield result
+        for task in ocr_tasks.values():
+            task.cancel()
+
+    @pytest.mark.slow
+    @pytest.mark.parametrize("case_id,tool,file_key,arguments", [
+        pytest.param(*case, id=case[0], marks=requires_sample(case[2])) for case in OCR_CASES
+    ])
+    async def test_read_text(self, ocr_results, case_id, tool, file_key, arguments):
+        """Test reading text with each OCR tool"""
+        result = await ocr_results(case_id)
         
         # Verify we got a result
-        assert result.content is not None
-        assert len(result.content) > 0
+        _assert_has_content(result)
         
         # Extract text from result
-        extracted_text = result.content[0].text if result.content else ""
+        extracted_text = _text(result)
         
-        # Print the extracted text for manual verification
-        print(f"\nExtracted text from PDF:\n{extracted_text}")
+        # Log the extracted text for manual verification
+        logger.debug("Extracted text from %s:\n%s", case_id, extracted_text)
         
-        # Basic validation - should not be empty for a real PDF
+        # Basic validation - should not be empty for a real file
         assert isinstance(extracted_text, str)
 
-    @pytest.mark.asyncio
-    async def test_read_text_with_default_languages(self, client, sample_files):
-        """Test reading text with default languages (en and th)"""
-        image_path = str(sample_files["image"])
-        
-        # Check if sample image exists
-        if not os.path.exists(image_path):
-            pytest.skip(f"Sample image not found at {image_path}")
-        
-        # Test with default languages (English and Thai)
+    @pytest.mark.slow
+    @requires_sample("image")
+    async def test_repeat_call_served_from_cache(self, client, ocr_inputs, ocr_results, ocr_idle, monkeypatch):
+        """Test that repeating an OCR call returns the cached result without new OCR work"""
+        first = await ocr_results("image-en")
+        await ocr_idle()
+
+        # Any OCR work from here on is a cache miss
+        ocr_calls = []
+        monkeypatch.setattr(OCRCore, "extract_text_from_image_array",
+                            staticmethod(lambda *args, **kwargs: ocr_calls.append(args) or ""))
         result = await client.call_tool("read_text_from_image", {
-            "image_path": image_path
+            "image_path": str(ocr_inputs["image"]),
+            "languages": LANGS_EN
         })
-        
-        # Verify we got a result
-        assert result.content is not None
-        assert len(result.content) > 0
-        
-        # Extract text from result
-        extracted_text = result.content[0].text if result.content else ""
-        
-        print(f"\nExtracted text with default languages:\n{extracted_text}")
-        
-        # Basic validation
-        assert isinstance(extracted_text, str)
 
-    @pytest.mark.asyncio
-    async def test_error_handling_nonexistent_file(self, client):
+        assert _text(result) == _text(first)
+        assert not ocr_calls, "Repeated call ran OCR instead of using the cache"
+
+    async def test_error_handling_nonexistent_file(self, client, ocr_idle, monkeypatch):
         """Test error handling for non-existent files"""
         nonexistent_path = "/path/to/nonexistent/file.png"
         
+        # The missing file must be rejected before the cache or a reader is touched
+        await ocr_idle()
+        touched = []
+        monkeypatch.setattr(core, "get_cache", lambda *args, **kwargs: touched.append("cache"))
+        monkeypatch.setattr(OCRCore, "get_reader", staticmethod(lambda *args, **kwargs: touched.append("reader")))
+        
         # Test with non-existent image
         result = await client.call_tool("read_text_from_image", {
             "image_path": nonexistent_path
         })
         
         # Should return an error message
-        assert result.content is not None
-        assert len(result.content) > 0
-        error_text = result.content[0].text if result.content else ""
-        assert "Error" in error_text or "not found" in error_text.lower()
+        _assert_has_content(result)
+        error_text = _text(result)
+        assert error_text == f"Error: Image file not found at {nonexistent_path}"
+        assert not touched, f"Missing file reached {touched}"
         
-        print(f"\nError handling result: {error_text}")
+        logger.debug("Error handling result: %s", error_text)
 
-    @pytest.mark.asyncio
     async def test_list_available_tools(self, client):
         """Test that we can list all available tools"""
         tools = await client.list_tools()
@@ -136,7 +213,7 @@ class TestVisionTools:
         for tool_name in expected_tools:
             assert tool_name in tool_names, f"Expected tool {tool_name} not found"
         
-        print(f"\nAvailable tools: {tool_names}")
+        logger.debug("Available tools: %s", tool_names)
 
 
 # Manual test function for quick verification
@@ -145,27 +222,26 @@ async def manual_test():
     print("Running manual tests...")
     
     # Get sample file paths
-    base_dir = Path(__file__).parent.parent
-    image_path = base_dir / "images" / "sample.png"
-    pdf_path = base_dir / "images" / "sample.pdf"
+    image_path = SAMPLE_FILES["image"]
+    pdf_path = SAMPLE_FILES["pdf"]
     
     async with Client(mcp) as client:
         print(f"\nTesting image: {image_path}")
-        if image_path.exists():
+        if SAMPLES_PRESENT["image"]:
             result = await client.call_tool("read_text_from_image", {
                 "image_path": str(image_path)
             })
-            print(f"Image result: {result.content[0].text if result.content else 'No content'}")
+            print(f"Image result: {_text(result) or 'No content'}")
         else:
             print("Sample image not found")
         
         print(f"\nTesting PDF: {pdf_path}")
-        if pdf_path.exists():
+        if SAMPLES_PRESENT["pdf"]:
             result = await client.call_tool("read_text_from_pdf", {
                 "pdf_path": str(pdf_path),
                 "num_pages": 1
             })
-            print(f"PDF result: {result.content[0].text if result.content else 'No content'}")
+            print(f"PDF result: {_text(result) or 'No content'}")
         else:
             print("Sample PDF not found")
 